@@ -0,0 +1,95 @@
+import torch
+from easyocr.craft_utils import adjustResultCoordinates, getDetBoxes
+
+# ImageNet statistics EasyOCR normalizes CRAFT inputs with, on a 0-255 scale.
+MEAN = (0.485 * 255, 0.456 * 255, 0.406 * 255)
+STD = (0.229 * 255, 0.224 * 255, 0.225 * 255)
+
+
+class CraftDetector:
+    """Runs the CRAFT detector of an EasyOCR reader on batches of BGR frames.
+
+    Each batch is staged in pinned host memory and uploaded on a dedicated
+    copy stream into one of two device buffers, so the upload of the next
+    batch overlaps inference on the current one. Conversion to normalized
+    FP16 happens on the GPU.
+    """
+
+    def __init__(self, reader, text_threshold=0.7, link_threshold=0.4, low_text=0.4):
+        detector = reader.detector
+        if isinstance(detector, torch.nn.DataParallel):
+            detector = detector.module
+        self.model = detector.half().eval()
+        self.device = next(self.model.parameters()).device
+        self.thresholds = (text_threshold, link_threshold, low_text)
+        self.copy_stream = torch.cuda.Stream(self.device)
+        self.mean = torch.tensor(MEAN, dtype=torch.float16, device=self.device)
+        self.std = torch.tensor(STD, dtype=torch.float16, device=self.device)
+        self.mean = self.mean.view(1, 3, 1, 1)
+        self.std = self.std.view(1, 3, 1, 1)
+        self.shape = None
+
+    def _allocate(self, shape):
+        self.shape = shape
+        self.host = [
+            torch.empty(shape, dtype=torch.uint8, pin_memory=True) for _ in range(2)
+        ]
+        self.staged = [
+            torch.empty(shape, dtype=torch.uint8, device=self.device) for _ in range(2)
+        ]
+        # uploaded[i]: host[i] may be refilled; released[i]: staged[i] may be
+        # overwritten by the next upload.
+        self.uploaded = [torch.cuda.Event() for _ in range(2)]
+        self.released = [torch.cuda.Event() for _ in range(2)]
+
+    def _submit(self, frames, slot):
+        count = len(frames)
+        host = self.host[slot][:count]
+        staged = self.staged[slot][:count]
+        self.uploaded[slot].synchronize()
+        host.numpy()[...] = frames
+
+        with torch.cuda.stream(self.copy_stream):
+            self.copy_stream.wait_event(self.released[slot])
+            staged.copy_(host, non_blocking=True)
+            self.uploaded[slot].record(self.copy_stream)
+
+        compute_stream = torch.cuda.current_stream(self.device)
+        compute_stream.wait_event(self.uploaded[slot])
+        with torch.no_grad():
+            images = staged.flip(-1).permute(0, 3, 1, 2).half()
+            scores, _ = self.model((images - self.mean) / self.std)
+            scores = scores.float()
+        self.released[slot].record(compute_stream)
+
+        scores_host = torch.empty(scores.shape, dtype=torch.float32, pin_memory=True)
+        scores_host.copy_(scores, non_blocking=True)
+        done = torch.cuda.Event()
+        done.record(compute_stream)
+        return scores_host, done
+
+    def _collect(self, scores_host, done):
+        done.synchronize()
+        boxes = []
+        for score in scores_host.numpy():
+            found = getDetBoxes(score[:, :, 0], score[:, :, 1], *self.thresholds)[0]
+            # Score maps are half the input resolution.
+            boxes.append(adjustResultCoordinates(found, 1, 1))
+        return boxes
+
+    def detect(self, frames, batch_size):
+        """Return the text boxes found in each frame, in frame coordinates."""
+        shape = (batch_size, *frames.shape[1:])
+        if self.shape != shape:
+            self._allocate(shape)
+
+        boxes = []
+        pending = None
+        for index, start in enumerate(range(0, len(frames), batch_size)):
+            submitted = self._submit(frames[start : start + batch_size], index % 2)
+            if pending is not None:
+                boxes.extend(self._collect(*pending))
+            pending = submitted
+        if pending is not None:
+            boxes.extend(self._collect(*pending))
+        return boxes
@@ -0,0 +1,259 @@
+import os
+import ctypes
+import logging
+import numpy as np
+import tensorrt as trt
+from cuda.bindings import runtime as cudart
+
+TRT_LOGGER = trt.Logger(trt.Logger.WARNING)
+
+INPUT_NAME = "image"
+OUTPUT_NAME = "scores"
+
+
+def _check(result):
+    err, *values = result
+    if err != cudart.cudaError_t.cudaSuccess:
+        raise RuntimeError(f"CUDA error: {cudart.cudaGetErrorString(err)[1]}")
+    if not values:
+        return None
+    return values[0] if len(values) == 1 else values
+
+
+def sm_version():
+    device = _check(cudart.cudaGetDevice())
+    props = _check(cudart.cudaGetDeviceProperties(device))
+    return f"sm{props.major}{props.minor}"
+
+
+def engine_path(engine_folder, max_batch, height, width, precision="fp16"):
+    # Engines are only valid on the architecture they were built for, and
+    # their optimization profile fixes the input size and largest batch.
+    name = f"craft_{height}x{width}_b{max_batch}_{sm_version()}_{precision}.engine"
+    return os.path.join(engine_folder, name)
+
+
+def calibration_cache_path(engine_folder, height, width):
+    name = f"craft_{height}x{width}_{sm_version()}_int8.cache"
+    return os.path.join(engine_folder, name)
+
+
+class CraftCalibrator(trt.IInt8EntropyCalibrator2):
+    """Feeds preprocessed video frames to TensorRT's INT8 calibration.
+
+    The calibration table is cached on disk, so once it exists later
+    builds skip calibration and never pull a single batch.
+    """
+
+    def __init__(self, batches, batch_size, cache_file):
+        trt.IInt8EntropyCalibrator2.__init__(self)
+        self.batches = batches
+        self.batch_size = batch_size
+        self.cache_file = cache_file
+        self.device_ptr = None
+
+    def get_batch_size(self):
+        return self.batch_size
+
+    def get_batch(self, names):
+        batch = next(self.batches, None)
+        if batch is None:
+            return None
+        batch = np.ascontiguousarray(batch, dtype=np.float32)
+        if self.device_ptr is None:
+            self.device_ptr = _check(cudart.cudaMalloc(batch.nbytes))
+        _check(
+            cudart.cudaMemcpy(
+                self.device_ptr,
+                batch.ctypes.data,
+                batch.nbytes,
+                cudart.cudaMemcpyKind.cudaMemcpyHostToDevice,
+            )
+        )
+        return [int(self.device_ptr)]
+
+    def read_calibration_cache(self):
+        if os.path.exists(self.cache_file):
+            with open(self.cache_file, "rb") as f:
+                return f.read()
+        return None
+
+    def write_calibration_cache(self, cache):
+        with open(self.cache_file, "wb") as f:
+            f.write(cache)
+        logging.info(f"INT8 calibration table saved to: {self.cache_file}")
+
+    def close(self):
+        if self.device_ptr is not None:
+            _check(cudart.cudaFree(self.device_ptr))
+            self.device_ptr = None
+
+
+def export_craft_onnx(reader, onnx_path, height, width):
+    import torch
+
+    class CraftScores(torch.nn.Module):
+        # CRAFT returns (scores, feature); only the score maps are needed.
+        def __init__(self, craft):
+            super().__init__()
+            self.craft = craft
+
+        def forward(self, image):
+            return self.craft(image)[0]
+
+    detector = reader.detector
+    if isinstance(detector, torch.nn.DataParallel):
+        detector = detector.module
+    model = CraftScores(detector).eval()
+    dummy = torch.zeros(1, 3, height, width, device=next(model.parameters()).device)
+    torch.onnx.export(
+        model,
+        dummy,
+        onnx_path,
+        input_names=[INPUT_NAME],
+        output_names=[OUTPUT_NAME],
+        dynamic_axes={INPUT_NAME: {0: "batch"}, OUTPUT_NAME: {0: "batch"}},
+        opset_version=17,
+    )
+    logging.info(f"Exported CRAFT detector to: {onnx_path}")
+
+
+def build_engine(onnx_path, engine_file, max_batch, height, width, calibrator=None):
+    builder = trt.Builder(TRT_LOGGER)
+    # Explicit batch is the only mode in TensorRT 10 and must be requested
+    # on 8.x, where the flag still exists.
+    network = builder.create_network(
+        1 << int(trt.NetworkDefinitionCreationFlag.EXPLICIT_BATCH)
+    )
+    parser = trt.OnnxParser(network, TRT_LOGGER)
+    with open(onnx_path, "rb") as f:
+        if not parser.parse(f.read()):
+            errors = [str(parser.get_error(i)) for i in range(parser.num_errors)]
+            raise RuntimeError(f"Failed to parse {onnx_path}: {errors}")
+
+    config = builder.create_builder_config()
+    config.set_flag(trt.BuilderFlag.FP16)
+    profile = builder.create_optimization_profile()
+    profile.set_shape(
+        INPUT_NAME,
+        (1, 3, height, width),
+        (max_batch, 3, height, width),
+        (max_batch, 3, height, width),
+    )
+    config.add_optimization_profile(profile)
+    if calibrator is not None:
+        # FP16 stays enabled for layers TensorRT cannot run in INT8.
+        config.set_flag(trt.BuilderFlag.INT8)
+        config.int8_calibrator = calibrator
+        config.set_calibration_profile(profile)
+
+    serialized = builder.build_serialized_network(network, config)
+    if serialized is None:
+        raise RuntimeError(f"Failed to build TensorRT engine from {onnx_path}")
+    with open(engine_file, "wb") as f:
+        f.write(serialized)
+    logging.info(f"TensorRT engine saved to: {engine_file}")
+
+
+class TRTInferSession:
+    """Runs a serialized engine on one stream with preallocated buffers."""
+
+    def __init__(self, engine_file, max_batch, height, width):
+        runtime = trt.Runtime(TRT_LOGGER)
+        with open(engine_file, "rb") as f:
+            self.engine = runtime.deserialize_cuda_engine(f.read())
+        self.context = self.engine.create_execution_context()
+        self.stream = _check(cudart.cudaStreamCreate())
+        self.max_batch = max_batch
+
+        # Size every buffer for the largest batch; smaller batches use a prefix.
+        self.context.set_input_shape(INPUT_NAME, (max_batch, 3, height, width))
+        self.buffers = {}
+        for i in range(self.engine.num_io_tensors):
+            name = self.engine.get_tensor_name(i)
+            shape = tuple(self.context.get_tensor_shape(name))
+            dtype = np.dtype(trt.nptype(self.engine.get_tensor_dtype(name)))
+            nbytes = int(np.prod(shape)) * dtype.itemsize
+            host_ptr = _check(cudart.cudaHostAlloc(nbytes, cudart.cudaHostAllocDefault))
+            host = np.frombuffer(
+                (ctypes.c_byte * nbytes).from_address(host_ptr), dtype=dtype
+            ).reshape(shape)
+            device_ptr = _check(cudart.cudaMalloc(nbytes))
+            self.context.set_tensor_address(name, device_ptr)
+            self.buffers[name] = (host, host_ptr, device_ptr)
+
+    def infer(self, batch):
+        count = len(batch)
+        if count > self.max_batch:
+            raise ValueError(f"Batch of {count} exceeds engine max {self.max_batch}")
+        self.context.set_input_shape(INPUT_NAME, batch.shape)
+
+        host, host_ptr, device_ptr = self.buffers[INPUT_NAME]
+        host[:count] = batch
+        _check(
+            cudart.cudaMemcpyAsync(
+                device_ptr,
+                host_ptr,
+                host[:count].nbytes,
+                cudart.cudaMemcpyKind.cudaMemcpyHostToDevice,
+                self.stream,
+            )
+        )
+        if not self.context.execute_async_v3(self.stream):
+            raise RuntimeError("TensorRT inference failed")
+
+        outputs = {}
+        for name, (host, host_ptr, device_ptr) in self.buffers.items():
+            if name == INPUT_NAME:
+                continue
+            _check(
+                cudart.cudaMemcpyAsync(
+                    host_ptr,
+                    device_ptr,
+                    host[:count].nbytes,
+                    cudart.cudaMemcpyKind.cudaMemcpyDeviceToHost,
+                    self.stream,
+                )
+            )
+            outputs[name] = host[:count]
+        _check(cudart.cudaStreamSynchronize(self.stream))
+        return {name: output.copy() for name, output in outputs.items()}
+
+    def close(self):
+        for host, host_ptr, device_ptr in self.buffers.values():
+            _check(cudart.cudaFreeHost(host_ptr))
+            _check(cudart.cudaFree(device_ptr))
+        self.buffers = {}
+        _check(cudart.cudaStreamDestroy(self.stream))
+
+
+def load_craft_session(
+    load_reader, engine_folder, max_batch, height, width, calibration_batches=None
+):
+    """Build (or reuse) the CRAFT engine and open a session on it.
+
+    The engine is FP16 unless ``calibration_batches`` is given, in which case
+    an INT8 engine is calibrated on the batches it returns. ``load_reader``
+    and ``calibration_batches`` are only called when something has to be
+    built, so cached engines never pay for loading the detector or frames.
+    """
+    os.makedirs(engine_folder, exist_ok=True)
+    precision = "fp16" if calibration_batches is None else "int8"
+    engine_file = engine_path(engine_folder, max_batch, height, width, precision)
+    if not os.path.exists(engine_file):
+        onnx_path = os.path.join(engine_folder, f"craft_{height}x{width}.onnx")
+        if not os.path.exists(onnx_path):
+            export_craft_onnx(load_reader(), onnx_path, height, width)
+        calibrator = None
+        if calibration_batches is not None:
+            calibrator = CraftCalibrator(
+                iter(calibration_batches()),
+                max_batch,
+                calibration_cache_path(engine_folder, height, width),
+            )
+        try:
+            build_engine(onnx_path, engine_file, max_batch, height, width, calibrator)
+        finally:
+            if calibrator is not None:
+                calibrator.close()
+    return TRTInferSession(engine_file, max_batch, height, width)
@@ -1,11 +1,17 @@
 import os
 import cv2
+import json
+import re
 import argparse
 import logging
 import numpy as np
-import easyocr
-import keras_ocr
 import subprocess
+import queue
+import heapq
+import threading
+import itertools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm
 from multiprocessing import Pool, cpu_count
 
@@ -13,58 +19,299 @@ logging.basicConfig(
     level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
+# Frame width batched EasyOCR detection runs at on the GPU.
+OCR_INPUT_WIDTH = 800
 
-def initialize_ocr_pipeline(ocr_method):
+# CRAFT input size (width, height) and batch limit for the TensorRT engine.
+# Both sides must be multiples of 32.
+TRT_INPUT_SIZE = (1280, 736)
+TRT_MAX_BATCH = 8
+TRT_ENGINE_FOLDER = "engines"
+TRT_METHODS = ("tensorrt", "tensorrt_int8")
+# Frames taken from the input to calibrate the INT8 engine.
+TRT_CALIBRATION_FRAMES = 512
+
+# Padding in pixels around each masked region when inpainting its bounding box.
+INPAINT_MARGIN = 8
+
+# Number of PNG frames read and decoded ahead of the one being processed.
+READ_AHEAD_DEPTH = 32
+
+# Remembers the first fourcc cv2.VideoWriter accepted on this machine.
+CODEC_CACHE_FILE = ".codec_cache"
+
+# OCR pipeline owned by the current worker process, set once by _init_worker.
+_WORKER_PIPELINE = None
+_WORKER_OCR_METHOD = None
+
+
+def initialize_ocr_pipeline(ocr_method, calibration_frames=None):
+    # Each backend pulls in PyTorch or TensorFlow, so only the requested one
+    # is imported, and only once the pipeline is actually needed.
     if ocr_method == "easyocr":
-        return easyocr.Reader(["en"])
+        import easyocr
+
+        if use_batched_ocr(ocr_method):
+            from craft_detector import CraftDetector
+
+            # Only the CRAFT detector runs on this path, so skip loading
+            # the recognition model.
+            return CraftDetector(
+                easyocr.Reader(["en"], cudnn_benchmark=True, recognizer=False)
+            )
+        return easyocr.Reader(["en"], cudnn_benchmark=True)
     elif ocr_method == "keras":
+        import keras_ocr
+
         return keras_ocr.pipeline.Pipeline()
+    elif ocr_method in TRT_METHODS:
+        import easyocr
+        from engine_builder import load_craft_session
+
+        calibration_batches = None
+        if ocr_method == "tensorrt_int8":
+            if calibration_frames is None:
+                raise ValueError("tensorrt_int8 needs frames to calibrate on")
+            calibration_batches = lambda: craft_calibration_batches(
+                calibration_frames()
+            )
+        width, height = TRT_INPUT_SIZE
+        return load_craft_session(
+            lambda: easyocr.Reader(["en"], recognizer=False),
+            TRT_ENGINE_FOLDER,
+            TRT_MAX_BATCH,
+            height,
+            width,
+            calibration_batches,
+        )
     elif ocr_method == "macocr":
         # Placeholder for macOCR initialization if needed
         pass
     return None
 
 
+def warmup_ocr_pipeline(ocr_method, ocr_pipeline, batch_size, height, width):
+    # cudnn_benchmark picks its kernels on the first call for a given shape,
+    # so pay that cost on a dummy batch instead of the first real one.
+    if ocr_method == "easyocr":
+        input_width, input_height = ocr_input_size(height, width)
+        ocr_pipeline.detect(
+            np.zeros([batch_size, input_height, input_width, 3], np.uint8), batch_size
+        )
+
+
+def ocr_input_size(height, width):
+    """Return the (width, height) a frame is scaled down to for batched OCR.
+
+    Both sides are rounded to a multiple of 32, which CRAFT expects.
+    """
+    scale = min(1.0, OCR_INPUT_WIDTH / width)
+    return (
+        max(32, round(width * scale / 32) * 32),
+        max(32, round(height * scale / 32) * 32),
+    )
+
+
+def gpu_available(ocr_method="easyocr"):
+    # Ask the framework the backend runs on, so keras never imports torch.
+    if ocr_method == "keras":
+        try:
+            import tensorflow as tf
+        except ImportError:
+            return False
+        return bool(tf.config.list_physical_devices("GPU"))
+    try:
+        import torch
+    except ImportError:
+        return False
+    return torch.cuda.is_available()
+
+
+def use_batched_ocr(ocr_method):
+    if ocr_method in TRT_METHODS:
+        return True
+    return ocr_method == "easyocr" and gpu_available(ocr_method)
+
+
+def _init_worker(ocr_method, calibration_frames=None):
+    global _WORKER_PIPELINE, _WORKER_OCR_METHOD
+    _WORKER_PIPELINE = initialize_ocr_pipeline(ocr_method, calibration_frames)
+    _WORKER_OCR_METHOD = ocr_method
+
+
+def _close_worker():
+    # TensorRT sessions hold pinned host and device buffers until closed.
+    global _WORKER_PIPELINE
+    if _WORKER_OCR_METHOD in TRT_METHODS and _WORKER_PIPELINE is not None:
+        _WORKER_PIPELINE.close()
+    _WORKER_PIPELINE = None
+
+
 def extract_frames_ffmpeg(video_path, frames_folder, fps, duration):
     os.makedirs(frames_folder, exist_ok=True)
     command = f"ffmpeg -i {video_path} -vf fps={fps} -t {duration} {frames_folder}/frame-%04d.png"
     subprocess.run(command, shell=True)
 
 
-def remove_subtitles(frame, ocr_method, ocr_pipeline, debug=False):
-    mask = detect_text_ocr(frame, ocr_method, ocr_pipeline)
-    inpainted_frame = cv2.inpaint(frame, mask, inpaintRadius=1, flags=cv2.INPAINT_TELEA)
-    return inpainted_frame, mask
+def inpaint_text(frame, mask, margin=INPAINT_MARGIN):
+    """Inpaint each masked region on its own bounding box only.
+
+    cv2.inpaint walks the whole image it is given, so cropping to the
+    (padded) box around every connected subtitle region keeps the cost
+    proportional to the text area instead of the frame area.
+    """
+    if mask is None or not mask.any():
+        return frame
+    count, labels, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    if count <= 1:
+        return frame
+
+    inpainted_frame = frame.copy()
+    height, width = mask.shape
+    for x, y, w, h, area in stats[1:]:
+        x0, y0 = max(x - margin, 0), max(y - margin, 0)
+        x1, y1 = min(x + w + margin, width), min(y + h + margin, height)
+        inpainted_frame[y0:y1, x0:x1] = cv2.inpaint(
+            inpainted_frame[y0:y1, x0:x1],
+            mask[y0:y1, x0:x1],
+            inpaintRadius=1,
+            flags=cv2.INPAINT_TELEA,
+        )
+    return inpainted_frame
+
+
+def polygons_to_mask(polys, shape):
+    # No detections means nothing to inpaint, which callers check as None
+    # instead of scanning an all-zero mask.
+    if not polys:
+        return None
+    # A single fillPoly call rasterizes every polygon in one C-level loop.
+    mask = np.zeros(shape, dtype=np.uint8)
+    cv2.fillPoly(mask, polys, 255)
+    return mask
 
 
 def detect_text_ocr(frame, ocr_method, ocr_pipeline):
     if ocr_method == "easyocr":
         result = ocr_pipeline.readtext(frame)
-        mask = np.zeros(frame.shape[:2], dtype=np.uint8)
-        for bbox, text, prob in result:
-            points = np.array(bbox).astype(np.int32)
-            cv2.fillPoly(mask, [points], (255))
-        return mask
+        polys = [np.asarray(bbox, np.int32) for bbox, text, prob in result]
+        return polygons_to_mask(polys, frame.shape[:2])
     elif ocr_method == "keras":
         predictions = ocr_pipeline.recognize([frame])
-        mask = np.zeros(frame.shape[:2], dtype=np.uint8)
-        for prediction in predictions[0]:
-            points = prediction[1].astype(np.int32)
-            cv2.fillPoly(mask, [points], (255))
-        return mask
-
-
-def process_frame(args):
-    frame_file, output_file, ocr_method, debug = args
-    frame = cv2.imread(frame_file)
-    ocr_pipeline = initialize_ocr_pipeline(ocr_method)
-    inpainted_frame, mask = remove_subtitles(
-        frame, ocr_method, ocr_pipeline, debug=debug
+        polys = [prediction[1].astype(np.int32) for prediction in predictions[0]]
+        return polygons_to_mask(polys, frame.shape[:2])
+    elif ocr_method in TRT_METHODS:
+        return detect_text_trt(frame[np.newaxis], ocr_pipeline)[0]
+
+
+def preprocess_craft(frames):
+    """Resize and normalize BGR frames into a CRAFT NCHW float32 batch."""
+    from easyocr.imgproc import normalizeMeanVariance
+
+    # normalizeMeanVariance already returns float32, so stacking is the
+    # only copy.
+    return np.stack(
+        [
+            normalizeMeanVariance(
+                cv2.cvtColor(
+                    cv2.resize(frame, TRT_INPUT_SIZE, interpolation=cv2.INTER_LINEAR),
+                    cv2.COLOR_BGR2RGB,
+                )
+            ).transpose(2, 0, 1)
+            for frame in frames
+        ]
     )
+
+
+def craft_calibration_batches(frames, count=TRT_CALIBRATION_FRAMES):
+    # The calibrator expects full batches, so a trailing partial one is dropped.
+    for batch in _batched(itertools.islice(frames, count), TRT_MAX_BATCH):
+        if len(batch) == TRT_MAX_BATCH:
+            yield preprocess_craft(batch)
+
+
+def detect_text_trt(frames, session):
+    """Run the CRAFT TensorRT engine and rasterize its boxes into masks."""
+    from easyocr.craft_utils import adjustResultCoordinates, getDetBoxes
+
+    height, width = frames.shape[1:3]
+    input_width, input_height = TRT_INPUT_SIZE
+
+    masks = []
+    # Convert one engine batch at a time; a chunk can hold dozens of
+    # keyframes and each one is several MB once normalized.
+    for start in range(0, len(frames), session.max_batch):
+        batch = preprocess_craft(frames[start : start + session.max_batch])
+        scores = session.infer(batch)["scores"]
+        for score in scores:
+            boxes = getDetBoxes(score[:, :, 0], score[:, :, 1], 0.7, 0.4, 0.4)[0]
+            boxes = adjustResultCoordinates(
+                boxes, width / input_width, height / input_height
+            )
+            polys = [np.asarray(box, np.int32) for box in boxes]
+            masks.append(polygons_to_mask(polys, (height, width)))
+    return masks
+
+
+def detect_text_batch(frames, ocr_method, ocr_pipeline, batch_size=8):
+    """Detect text in a stack of equally sized frames, one mask per frame."""
+    if ocr_method in TRT_METHODS:
+        return detect_text_trt(frames, ocr_pipeline)
+    if ocr_method != "easyocr":
+        return [detect_text_ocr(frame, ocr_method, ocr_pipeline) for frame in frames]
+
+    # Resizing here, once, to the size the reader was warmed up with keeps
+    # every call on the same input shape; the boxes are scaled back to the
+    # full-resolution frame afterwards.
+    height, width = frames.shape[1:3]
+    input_width, input_height = ocr_input_size(height, width)
+    if (input_width, input_height) != (width, height):
+        frames = np.stack(
+            [
+                cv2.resize(
+                    frame, (input_width, input_height), interpolation=cv2.INTER_AREA
+                )
+                for frame in frames
+            ]
+        )
+    scale = np.array([width / input_width, height / input_height], np.float32)
+    return [
+        polygons_to_mask(
+            [(np.asarray(box, np.float32) * scale).astype(np.int32) for box in boxes],
+            (height, width),
+        )
+        for boxes in ocr_pipeline.detect(frames, batch_size)
+    ]
+
+
+def list_frames(frames_folder, prefix):
+    """Return the paths of ``<prefix><number>.png`` frames in numeric order.
+
+    Sorting on the parsed number keeps frame-10000.png after frame-9999.png
+    once the zero padding runs out.
+    """
+    pattern = re.compile(rf"{re.escape(prefix)}(\d+)\.png")
+    with os.scandir(frames_folder) as entries:
+        frames = [
+            (int(match.group(1)), entry.path)
+            for entry in entries
+            if (match := pattern.fullmatch(entry.name))
+        ]
+    frames.sort()
+    return [path for _, path in frames]
+
+
+def inpainted_frame_path(frame_file, output_folder):
+    return os.path.join(output_folder, f"inpainted_{os.path.basename(frame_file)}")
+
+
+def save_frame(frame_file, output_file, inpainted_frame, mask, debug):
     if debug:
         os.makedirs("debug_frames", exist_ok=True)
         debug_frame_file = os.path.join("debug_frames", os.path.basename(frame_file))
         cv2.imwrite(debug_frame_file, inpainted_frame)
+        if mask is None:
+            mask = np.zeros(inpainted_frame.shape[:2], dtype=np.uint8)
         debug_mask_file = os.path.join(
             "debug_frames", os.path.basename(frame_file).replace(".png", "_mask.png")
         )
@@ -73,64 +320,169 @@ def process_frame(args):
     logging.debug(f"Processed frame: {frame_file}")
 
 
-def inpaint_frames(frames_folder, ocr_method, debug, parallel):
-    frame_files = sorted(
-        [
-            os.path.join(frames_folder, frame)
-            for frame in os.listdir(frames_folder)
-            if frame.endswith(".png") and not frame.startswith("inpainted_")
-        ]
-    )
-    output_files = [
-        os.path.join(frames_folder, f"inpainted_{os.path.basename(frame)}")
-        for frame in frame_files
-    ]
-    args = [
-        (frame_files[i], output_files[i], ocr_method, debug)
-        for i in range(len(frame_files))
-    ]
+def _read_frame(frame_file):
+    try:
+        with open(frame_file, "rb") as f:
+            data = f.read()
+    except OSError as e:
+        logging.error(f"Error reading frame: {frame_file}")
+        logging.error(e)
+        return None
+    return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+
+
+def read_frames_ahead(frame_files, depth=READ_AHEAD_DEPTH):
+    """Yield decoded frames in order while up to ``depth`` reads are in flight.
+
+    File reads and cv2.imdecode both release the GIL, so a small thread pool
+    keeps the disk queue full instead of reading one PNG at a time.
+    """
+    with ThreadPoolExecutor(max_workers=min(depth, cpu_count())) as executor:
+        pending = deque()
+        for frame_file in frame_files:
+            pending.append(executor.submit(_read_frame, frame_file))
+            if len(pending) >= depth:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def inpaint_frames_in_order(
+    frame_files, chunk_size, cache, detect, output_folder, debug
+):
+    """Inpaint frames chunk by chunk, running ``detect`` on keyframes only.
+
+    Frames are handled in order in this process so ``cache`` sees them in
+    sequence; ``detect`` may still fan keyframes out to a batch or a pool.
+    """
+    frames_ahead = read_frames_ahead(frame_files)
+    with tqdm(total=len(frame_files)) as progress:
+        for start in range(0, len(frame_files), chunk_size):
+            chunk_files = frame_files[start : start + chunk_size]
+            frames = [next(frames_ahead) for _ in chunk_files]
+            masks = cache.get_masks(frames, detect)
+            for frame_file, frame, mask in zip(chunk_files, frames, masks):
+                output_file = inpainted_frame_path(frame_file, output_folder)
+                inpainted_frame = inpaint_text(frame, mask)
+                save_frame(frame_file, output_file, inpainted_frame, mask, debug)
+            progress.update(len(chunk_files))
+
 
+def inpaint_frames(
+    frames_folder,
+    ocr_method,
+    debug,
+    parallel,
+    batch_size=8,
+    ocr_interval=10,
+    scene_threshold=5.0,
+):
+    frame_files = list_frames(frames_folder, "frame-")
+    if not frame_files:
+        return
+    cache = SubtitleMaskCache(ocr_interval, scene_threshold)
+
+    # Batching replaces multiprocessing on the GPU: one process, one CUDA
+    # context, and fixed-size batches so cuDNN can reuse the same kernels.
+    if use_batched_ocr(ocr_method):
+        _init_worker(
+            ocr_method, calibration_frames=lambda: read_frames_ahead(frame_files)
+        )
+        try:
+            height, width = cv2.imread(frame_files[0]).shape[:2]
+            warmup_ocr_pipeline(ocr_method, _WORKER_PIPELINE, batch_size, height, width)
+            inpaint_frames_in_order(
+                frame_files,
+                batch_size * ocr_interval,
+                cache,
+                lambda keyframes: detect_text_batch(
+                    np.stack(keyframes), ocr_method, _WORKER_PIPELINE, batch_size
+                ),
+                frames_folder,
+                debug,
+            )
+        finally:
+            _close_worker()
+        return
+
+    # Workers only run OCR on keyframes; chunks are sized so each worker
+    # gets about one keyframe per chunk.
     if parallel:
-        with Pool(max(1, cpu_count() // 2)) as pool:
-            for _ in tqdm(pool.imap_unordered(process_frame, args), total=len(args)):
-                pass
+        workers = max(1, cpu_count() // 2)
+        with Pool(workers, initializer=_init_worker, initargs=(ocr_method,)) as pool:
+            inpaint_frames_in_order(
+                frame_files,
+                workers * ocr_interval,
+                cache,
+                lambda keyframes: pool.map(_detect_text_worker, keyframes),
+                frames_folder,
+                debug,
+            )
     else:
-        for arg in tqdm(args):
-            process_frame(arg)
+        _init_worker(ocr_method)
+        inpaint_frames_in_order(
+            frame_files,
+            ocr_interval,
+            cache,
+            lambda keyframes: [_detect_text_worker(frame) for frame in keyframes],
+            frames_folder,
+            debug,
+        )
+
+
+def load_cached_codec():
+    try:
+        with open(CODEC_CACHE_FILE, "r") as f:
+            return json.load(f)["fourcc"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def save_cached_codec(codec):
+    # The cache only saves probing next time, so failing to write it must
+    # not abort a reassembly that already has a working writer.
+    try:
+        with open(CODEC_CACHE_FILE, "w") as f:
+            json.dump({"fourcc": codec}, f)
+    except OSError as e:
+        logging.warning(f"Could not save codec cache {CODEC_CACHE_FILE}: {e}")
 
 
 def reassemble_video(output_video_path, frames_folder, fps):
-    inpainted_files = sorted(
-        [
-            os.path.join(frames_folder, frame)
-            for frame in os.listdir(frames_folder)
-            if frame.startswith("inpainted_")
-        ]
-    )
+    inpainted_files = list_frames(frames_folder, "inpainted_frame-")
     if not inpainted_files:
         raise FileNotFoundError("No inpainted frames found to reassemble the video.")
     frame = cv2.imread(inpainted_files[0])
     height, width, layers = frame.shape
     logging.info(f"Video dimensions: width={width}, height={height}")
 
-    # Try different codecs
+    # Try different codecs, starting with the one that worked last time
     codecs = ["mp4v", "avc1", "H264", "XVID", "MJPG"]
+    cached_codec = load_cached_codec()
+    if cached_codec in codecs:
+        codecs.remove(cached_codec)
+        codecs.insert(0, cached_codec)
+
+    video = None
     for codec in codecs:
         video = cv2.VideoWriter(
             output_video_path, cv2.VideoWriter_fourcc(*codec), fps, (width, height)
         )
         if video.isOpened():
+            if codec != cached_codec:
+                save_cached_codec(codec)
             break
         else:
             logging.error(f"Failed to open video writer with codec: {codec}")
+            video.release()
+            video = None
 
-    if not video.isOpened():
+    if video is None:
         logging.error("Failed to open video writer with all tested codecs.")
         return
 
-    for frame_file in inpainted_files:
+    for frame_file, frame in zip(inpainted_files, read_frames_ahead(inpainted_files)):
         try:
-            frame = cv2.imread(frame_file)
             if frame is not None:
                 video.write(frame)
                 logging.info(f"Writing frame: {frame_file}")
@@ -148,7 +500,420 @@ def reassemble_video(output_video_path, frames_folder, fps):
         logging.error(f"Failed to create the video: {output_video_path}")
 
 
+def probe_video_size(video_path):
+    """Return the size of the decoded frames, after ffmpeg's autorotation."""
+    command = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-select_streams",
+        "v:0",
+        "-show_entries",
+        "stream=width,height:stream_tags=rotate:stream_side_data=rotation",
+        "-of",
+        "json",
+        video_path,
+    ]
+    output = subprocess.run(command, capture_output=True, text=True, check=True)
+    stream = json.loads(output.stdout)["streams"][0]
+    width, height = stream["width"], stream["height"]
+    # Phone videos store portrait frames as landscape plus a rotation, which
+    # older ffmpeg versions report as a tag and newer ones as side data.
+    rotation = stream.get("tags", {}).get("rotate", 0)
+    for side_data in stream.get("side_data_list", []):
+        rotation = side_data.get("rotation", rotation)
+    if int(rotation) % 180 != 0:
+        width, height = height, width
+    return width, height
+
+
+def read_frames_ffmpeg(video_path, fps, duration, width, height):
+    """Yield decoded BGR frames straight from an ffmpeg pipe."""
+    command = [
+        "ffmpeg",
+        "-loglevel",
+        "error",
+        "-i",
+        video_path,
+        "-t",
+        str(duration),
+        "-vf",
+        f"fps={fps}",
+        "-f",
+        "rawvideo",
+        "-pix_fmt",
+        "bgr24",
+        "pipe:1",
+    ]
+    frame_size = width * height * 3
+    process = subprocess.Popen(command, stdout=subprocess.PIPE)
+    try:
+        while True:
+            data = process.stdout.read(frame_size)
+            if len(data) < frame_size:
+                break
+            yield np.frombuffer(data, np.uint8).reshape(height, width, 3)
+    finally:
+        process.stdout.close()
+        process.wait()
+
+
+def open_writer_ffmpeg(output_video_path, fps, width, height):
+    command = [
+        "ffmpeg",
+        "-loglevel",
+        "error",
+        "-y",
+        "-f",
+        "rawvideo",
+        "-pix_fmt",
+        "bgr24",
+        "-s",
+        f"{width}x{height}",
+        "-r",
+        str(fps),
+        "-i",
+        "pipe:0",
+        # yuv420p subsamples chroma by two, so libx264 needs even sizes.
+        "-vf",
+        "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+        "-c:v",
+        "libx264",
+        "-pix_fmt",
+        "yuv420p",
+        output_video_path,
+    ]
+    return subprocess.Popen(command, stdin=subprocess.PIPE)
+
+
+def _detect_text_worker(frame):
+    return detect_text_ocr(frame, _WORKER_OCR_METHOD, _WORKER_PIPELINE)
+
+
+def _batched(frames, batch_size):
+    batch = []
+    for frame in frames:
+        batch.append(frame)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# Sentinel passed down the streaming queues once the input is exhausted.
+_END_OF_STREAM = None
+
+
+class _PipelineState:
+    """Holds the first error raised by any streaming stage.
+
+    Once ``failed`` is set, stages stop doing work but keep draining their
+    input queues, so nothing upstream blocks on a full queue and every
+    thread can still be joined.
+    """
+
+    def __init__(self):
+        self.error = None
+        self.failed = threading.Event()
+        self.lock = threading.Lock()
+
+    def fail(self, error):
+        with self.lock:
+            if self.error is None:
+                self.error = error
+        self.failed.set()
+
+
+def _decode_stage(frames, chunk_size, chunks, state):
+    try:
+        for chunk in _batched(frames, chunk_size):
+            if state.failed.is_set():
+                break
+            chunks.put(chunk)
+    except Exception as e:
+        logging.error(f"Error decoding frames: {e}")
+        state.fail(e)
+    finally:
+        # Closing the generator stops the ffmpeg decoder early on failure.
+        frames.close()
+        chunks.put(_END_OF_STREAM)
+
+
+def _inpaint_stage(masked_frames, inpainted_frames, state):
+    # cv2.inpaint releases the GIL, so several of these run in parallel.
+    try:
+        while (item := masked_frames.get()) is not _END_OF_STREAM:
+            if state.failed.is_set():
+                continue
+            index, frame, mask = item
+            try:
+                inpainted_frames.put((index, inpaint_text(frame, mask)))
+            except Exception as e:
+                logging.error(f"Error inpainting frame {index}: {e}")
+                state.fail(e)
+    finally:
+        inpainted_frames.put(_END_OF_STREAM)
+
+
+class _EncodeStage:
+    """Writes inpainted frames to the encoder in their original order."""
+
+    def __init__(self, writer, inpainted_frames, producers, progress, state):
+        self.writer = writer
+        self.inpainted_frames = inpainted_frames
+        self.producers = producers
+        self.progress = progress
+        self.state = state
+
+    def run(self):
+        pending = []
+        next_index = 0
+        finished = 0
+        while finished < self.producers:
+            item = self.inpainted_frames.get()
+            if item is _END_OF_STREAM:
+                finished += 1
+                continue
+            # After a failure frames may be missing, so stop reordering and
+            # only drain until every producer has finished.
+            if self.state.failed.is_set():
+                pending = []
+                continue
+            heapq.heappush(pending, item)
+            while pending and pending[0][0] == next_index:
+                _, frame = heapq.heappop(pending)
+                self._write(frame)
+                next_index += 1
+
+    def _write(self, frame):
+        try:
+            self.writer.stdin.write(frame.tobytes())
+            self.progress.update(1)
+        except Exception as e:
+            logging.error(f"Error writing frame to encoder: {e}")
+            self.state.fail(e)
+
+
+class SubtitleMaskCache:
+    """Reuses the last OCR mask for frames that follow it closely.
+
+    Subtitles stay at the same position for many consecutive frames, so OCR
+    only runs on keyframes: every ``interval`` frames, or earlier when the
+    frame differs from the last keyframe by more than ``scene_threshold``
+    (mean absolute difference in gray levels). Frames in between reuse the
+    keyframe mask, slightly dilated to absorb small movements.
+    """
+
+    def __init__(self, interval=10, scene_threshold=5.0, dilation=5):
+        self.interval = interval
+        self.scene_threshold = scene_threshold
+        self.kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (dilation, dilation))
+        self.frame_index = -1
+        self.keyframe_index = None
+        self.keyframe_gray = None
+        self.reused_mask = None
+
+    def _is_keyframe(self, frame):
+        self.frame_index += 1
+        # A quarter-resolution thumbnail is plenty to spot scene cuts.
+        gray = cv2.cvtColor(
+            cv2.resize(frame, None, fx=0.25, fy=0.25, interpolation=cv2.INTER_AREA),
+            cv2.COLOR_BGR2GRAY,
+        )
+        if (
+            self.keyframe_gray is None
+            or self.frame_index - self.keyframe_index >= self.interval
+            or cv2.absdiff(self.keyframe_gray, gray).mean() >= self.scene_threshold
+        ):
+            self.keyframe_index = self.frame_index
+            self.keyframe_gray = gray
+            return True
+        return False
+
+    def get_masks(self, frames, detect):
+        """Return one mask per frame, calling ``detect`` on keyframes only."""
+        keyframes = [i for i, frame in enumerate(frames) if self._is_keyframe(frame)]
+        detected = {}
+        if keyframes:
+            detected = dict(zip(keyframes, detect([frames[i] for i in keyframes])))
+
+        masks = []
+        for i in range(len(frames)):
+            if i in detected:
+                masks.append(detected[i])
+                self.reused_mask = (
+                    None
+                    if detected[i] is None
+                    else cv2.dilate(detected[i], self.kernel)
+                )
+            else:
+                masks.append(self.reused_mask)
+        return masks
+
+
+def process_video_stream(
+    input_video,
+    output_video,
+    ocr_method,
+    fps,
+    duration,
+    parallel,
+    batch_size=8,
+    ocr_interval=10,
+    scene_threshold=5.0,
+):
+    """Remove subtitles without writing intermediate frames to disk.
+
+    Frames are decoded by one ffmpeg process, inpainted in memory and piped
+    straight into a second ffmpeg process that encodes the output video.
+    """
+    width, height = probe_video_size(input_video)
+    logging.info(f"Video dimensions: width={width}, height={height}")
+
+    # Frames are read in chunks sized so that each chunk holds about one
+    # batch (or one frame per worker) worth of OCR keyframes.
+    pool = None
+    if use_batched_ocr(ocr_method):
+        _init_worker(
+            ocr_method,
+            calibration_frames=lambda: read_frames_ffmpeg(
+                input_video, fps, duration, width, height
+            ),
+        )
+        warmup_ocr_pipeline(ocr_method, _WORKER_PIPELINE, batch_size, height, width)
+        chunk_size = batch_size * ocr_interval
+
+        def detect(keyframes):
+            # The detector splits keyframes into batches itself, uploading
+            # the next batch while the current one is inferred.
+            return detect_text_batch(
+                np.stack(keyframes), ocr_method, _WORKER_PIPELINE, batch_size
+            )
+
+    elif parallel:
+        workers = max(1, cpu_count() // 2)
+        pool = Pool(workers, initializer=_init_worker, initargs=(ocr_method,))
+        chunk_size = workers * ocr_interval
+
+        def detect(keyframes):
+            return pool.map(_detect_text_worker, keyframes)
+
+    else:
+        _init_worker(ocr_method)
+        chunk_size = ocr_interval
+
+        def detect(keyframes):
+            return [_detect_text_worker(frame) for frame in keyframes]
+
+    # Decoding, OCR, inpainting and encoding run as concurrent stages joined
+    # by bounded queues, so throughput is set by the slowest stage instead of
+    # the sum of all of them. OCR stays on this thread because the mask
+    # cache depends on frame order. Chunks are large, so only one waits
+    # while the decoder fills the next; the per-frame queues only need to
+    # keep the inpaint workers busy.
+    inpaint_workers = max(1, cpu_count() // 2)
+    queue_size = 2 * max(batch_size, inpaint_workers)
+    chunks = queue.Queue(maxsize=1)
+    masked_frames = queue.Queue(maxsize=queue_size)
+    inpainted_frames = queue.Queue(maxsize=queue_size)
+    frames = read_frames_ffmpeg(input_video, fps, duration, width, height)
+    writer = open_writer_ffmpeg(output_video, fps, width, height)
+    progress = tqdm()
+    state = _PipelineState()
+    encoder = _EncodeStage(writer, inpainted_frames, inpaint_workers, progress, state)
+    threads = [
+        threading.Thread(
+            target=_decode_stage,
+            args=(frames, chunk_size, chunks, state),
+            daemon=True,
+        )
+    ]
+    threads += [
+        threading.Thread(
+            target=_inpaint_stage,
+            args=(masked_frames, inpainted_frames, state),
+            daemon=True,
+        )
+        for _ in range(inpaint_workers)
+    ]
+    threads.append(threading.Thread(target=encoder.run, daemon=True))
+    for thread in threads:
+        thread.start()
+
+    cache = SubtitleMaskCache(ocr_interval, scene_threshold)
+    index = 0
+    decoded = False
+    try:
+        while not state.failed.is_set():
+            chunk = chunks.get()
+            if chunk is _END_OF_STREAM:
+                decoded = True
+                break
+            for frame, mask in zip(chunk, cache.get_masks(chunk, detect)):
+                masked_frames.put((index, frame, mask))
+                index += 1
+    except BaseException as e:
+        state.fail(e)
+        raise
+    finally:
+        # Let the decoder see the failure, stop ffmpeg and exit.
+        while not decoded and chunks.get() is not _END_OF_STREAM:
+            pass
+        for _ in range(inpaint_workers):
+            masked_frames.put(_END_OF_STREAM)
+        for thread in threads:
+            thread.join()
+        progress.close()
+        if state.error is not None:
+            # Do not let the encoder finalize a truncated video.
+            writer.kill()
+        try:
+            writer.stdin.close()
+        except BrokenPipeError:
+            pass
+        writer.wait()
+        if pool is not None:
+            pool.close()
+            pool.join()
+        _close_worker()
+
+    if state.error is not None:
+        raise state.error
+    if writer.returncode == 0:
+        logging.info(f"Video successfully saved to: {output_video}")
+    else:
+        logging.error(f"Failed to create the video: {output_video}")
+
+
 def main(args):
+    # Worker processes would each create their own CUDA context (~300 MB,
+    # and TensorFlow reserves most of the GPU memory per process) and take
+    # turns on the one GPU, so GPU runs stay in a single process. Backends
+    # with a batched GPU path make up for it with batching.
+    parallel = not args.no_parallel
+    if parallel and (
+        use_batched_ocr(args.ocr) or (args.ocr == "keras" and gpu_available(args.ocr))
+    ):
+        logging.info("GPU detected, running OCR in a single process")
+        parallel = False
+
+    # Without debug output or a resumed run there is no reason to keep the
+    # intermediate PNGs, so stream frames through memory instead.
+    if args.start_step == "extract" and not (args.debug or args.keep_frames):
+        process_video_stream(
+            args.input_video,
+            args.output_video,
+            args.ocr,
+            args.fps,
+            args.duration,
+            parallel,
+            batch_size=args.batch_size,
+            ocr_interval=args.ocr_interval,
+            scene_threshold=args.scene_threshold,
+        )
+        return
+
     steps = ["extract", "inpaint", "reassemble"]
     start_index = steps.index(args.start_step)
 
@@ -157,7 +922,15 @@ def main(args):
             args.input_video, args.frames_folder, args.fps, args.duration
         )
     if "inpaint" in steps[start_index:]:
-        inpaint_frames(args.frames_folder, args.ocr, args.debug, not args.no_parallel)
+        inpaint_frames(
+            args.frames_folder,
+            args.ocr,
+            args.debug,
+            parallel,
+            args.batch_size,
+            args.ocr_interval,
+            args.scene_threshold,
+        )
     if "reassemble" in steps[start_index:]:
         reassemble_video(args.output_video, args.frames_folder, args.fps)
 
@@ -169,7 +942,7 @@ if __name__ == "__main__":
     parser.add_argument(
         "--ocr",
         type=str,
-        choices=["easyocr", "keras", "macocr"],
+        choices=["easyocr", "keras", "tensorrt", "tensorrt_int8", "macocr"],
         help="OCR method to use",
     )
     parser.add_argument("--fps", type=int, default=30, help="Frames per second")
@@ -178,7 +951,15 @@ if __name__ == "__main__":
     )
     parser.add_argument("--debug", action="store_true", help="Enable debug mode")
     parser.add_argument(
-        "--no_parallel", action="store_true", help="Disable parallel processing"
+        "--no_parallel",
+        action="store_true",
+        help="Disable parallel processing (always off when OCR runs on a GPU)",
+    )
+    parser.add_argument(
+        "--batch_size",
+        type=int,
+        default=8,
+        help="Frames per OCR batch when running on the GPU",
     )
     parser.add_argument(
         "--frames_folder",
@@ -186,6 +967,23 @@ if __name__ == "__main__":
         default="frames",
         help="Folder to store extracted frames",
     )
+    parser.add_argument(
+        "--ocr_interval",
+        type=int,
+        default=10,
+        help="Run OCR at most every N frames and reuse the mask in between",
+    )
+    parser.add_argument(
+        "--scene_threshold",
+        type=float,
+        default=5.0,
+        help="Mean frame difference that forces OCR before the interval ends",
+    )
+    parser.add_argument(
+        "--keep_frames",
+        action="store_true",
+        help="Write extracted and inpainted frames to the frames folder",
+    )
     parser.add_argument(
         "--debug_folder",
         type=str,
@@ -1,28 +1,80 @@
 import sys
 import os
+import asyncio
 from pytube import YouTube
 import ffmpeg
-import requests
+import httpx
+from aiolimiter import AsyncLimiter
 from youtube_transcript_api import YouTubeTranscriptApi
-from video_subtitle_remover import (
-    extract_frames_ffmpeg,
-    inpaint_frames,
-    reassemble_video,
-)
-import time
+from video_subtitle_remover import process_video_stream
 
+TRANSLATION_URL = "https://api.mymemory.translated.net/get"
+# Requests in flight at once, and requests started per second, to stay
+# within MyMemory's rate limits.
+TRANSLATION_CONCURRENCY = 5
+TRANSLATION_RATE = 5
+# Lines are joined with a marker the translator leaves alone, so one request
+# can carry several of them. MyMemory rejects queries over 500 bytes.
+TRANSLATION_SEPARATOR = "⟦SEP⟧"
+TRANSLATION_BATCH_SIZE = 20
+TRANSLATION_MAX_QUERY_BYTES = 500
 
-def translate_to_chinese(text):
-    base_url = "https://api.mymemory.translated.net/get"
+
+async def translate_to_chinese(client, text):
     params = {"q": text, "langpair": "en|zh"}
 
-    response = requests.get(base_url, params=params)
+    response = await client.get(TRANSLATION_URL, params=params)
     if response.status_code == 200:
         return response.json()["responseData"]["translatedText"]
     else:
         raise Exception(f"Translation failed: {response.text}")
 
 
+def batch_texts(texts):
+    batches = []
+    batch = []
+    size = 0
+    for text in texts:
+        text_size = len(f" {TRANSLATION_SEPARATOR} {text}".encode("utf-8"))
+        if batch and (
+            len(batch) == TRANSLATION_BATCH_SIZE
+            or size + text_size > TRANSLATION_MAX_QUERY_BYTES
+        ):
+            batches.append(batch)
+            batch = []
+            size = 0
+        batch.append(text)
+        size += text_size
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+async def translate_texts(texts):
+    semaphore = asyncio.Semaphore(TRANSLATION_CONCURRENCY)
+    limiter = AsyncLimiter(TRANSLATION_RATE, 1)
+
+    async def translate_one(client, text):
+        async with semaphore, limiter:
+            return await translate_to_chinese(client, text)
+
+    async def translate_batch(client, batch):
+        if len(batch) > 1:
+            joined = f" {TRANSLATION_SEPARATOR} ".join(batch)
+            translated = await translate_one(client, joined)
+            parts = [part.strip() for part in translated.split(TRANSLATION_SEPARATOR)]
+            if len(parts) == len(batch):
+                return parts
+        # The separator did not survive translation, so send lines one by one.
+        return await asyncio.gather(*(translate_one(client, text) for text in batch))
+
+    async with httpx.AsyncClient() as client:
+        batches = await asyncio.gather(
+            *(translate_batch(client, batch) for batch in batch_texts(texts))
+        )
+    return [text for batch in batches for text in batch]
+
+
 def create_srt_file(transcript, output_file):
     with open(output_file, "w", encoding="utf-8") as f:
         for i, entry in enumerate(transcript, 1):
@@ -33,23 +85,25 @@ def create_srt_file(transcript, output_file):
 
 
 def format_time(seconds):
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    seconds = int(seconds % 60)
-    milliseconds = int((seconds % 1) * 1000)
+    milliseconds = int(round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3_600_000)
+    minutes, milliseconds = divmod(milliseconds, 60_000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
     return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
 
 
 def download_video_audio(url, download_video=True, download_audio=True):
     try:
         yt = YouTube(url)
+        # Build the stream list once and filter it for both downloads.
+        streams = yt.streams
 
         video_file = None
         audio_file = None
 
         if download_video:
             video_stream = (
-                yt.streams.filter(adaptive=True, file_extension="mp4", type="video")
+                streams.filter(adaptive=True, file_extension="mp4", type="video")
                 .order_by("resolution")
                 .desc()
                 .first()
@@ -59,7 +113,7 @@ def download_video_audio(url, download_video=True, download_audio=True):
 
         if download_audio:
             audio_stream = (
-                yt.streams.filter(only_audio=True).order_by("abr").desc().first()
+                streams.filter(only_audio=True).order_by("abr").desc().first()
             )
             print(f"Downloading audio... Bitrate: {audio_stream.abr}")
             audio_file = audio_stream.download(filename_prefix="audio_")
@@ -83,13 +137,15 @@ def translate_transcript(transcript, translate=True):
     if not translate:
         return transcript
 
-    chinese_transcript = []
     try:
         print("Translating transcript to Chinese...")
-        for entry in transcript:
-            chinese_text = translate_to_chinese(entry["text"])
-            chinese_transcript.append({**entry, "text": chinese_text})
-            time.sleep(1)  # To avoid hitting API rate limits
+        chinese_texts = asyncio.run(
+            translate_texts([entry["text"] for entry in transcript])
+        )
+        chinese_transcript = [
+            {**entry, "text": chinese_text}
+            for entry, chinese_text in zip(transcript, chinese_texts)
+        ]
     except Exception as e:
         print(f"An error occurred during translation: {str(e)}")
         return None
@@ -157,10 +213,17 @@ if __name__ == "__main__":
                 url, download_video=DOWNLOAD_VIDEO, download_audio=DOWNLOAD_AUDIO
             )
 
+        clean_video_file = None
         if REMOVE_SUBTITLES:
-            extract_frames_ffmpeg(video_file, "frames", fps=1, duration=10)
-            inpaint_frames("frames", ocr=True, debug=False, parallel=False)
-            reassemble_video(video_file, "frames", fps=30)
+            clean_video_file = "video_without_subtitles.mp4"
+            process_video_stream(
+                video_file,
+                clean_video_file,
+                "easyocr",
+                fps=30,
+                duration=10,
+                parallel=False,
+            )
 
         if FETCH_TRANSCRIPT and yt:
             transcript = fetch_transcript(yt.video_id)
@@ -174,11 +237,15 @@ if __name__ == "__main__":
         if CREATE_SRT and transcript:
             create_srt_file(transcript, srt_file)
 
-        output_file = f"{YouTube(url).title.replace('/', '_')}_with_subtitles.mp4"
+        title = (yt.title if yt else "video").replace("/", "_")
+        output_file = f"{title}_with_subtitles.mp4"
         if MERGE_MEDIA:
-            merge_media(video_file, audio_file, srt_file, output_file)
+            merge_media(
+                clean_video_file or video_file, audio_file, srt_file, output_file
+            )
 
         clean_up(
+            clean_video_file,
             video_file if DOWNLOAD_VIDEO else None,
             audio_file if DOWNLOAD_AUDIO else None,
             srt_file if CREATE_SRT else None,